@@ -1,7 +1,17 @@
 import discord
 import asyncio
 import os
+import json
+import heapq
+import hashlib
+import pickle
+import multiprocessing
+import time
 import datetime
+from itertools import count, islice
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from discord.ext import commands, tasks
 from src.brain.john_ai import john_analysis
 from src.brain.alpha_ai import alpha_analysis
@@ -19,7 +29,527 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 last_analysis_time = {}
 high_potential_coins = {}
 
-@tasks.loop(minutes=60)
+# Circuit breakers for upstream endpoints
+# Seconds before a call to an endpoint counts as failed, so a hung provider opens its
+# breaker within a few cycles; endpoints not listed rely on the provider's own timeouts.
+UPSTREAM_TIMEOUTS = {"market_data": 120, "volume_spikes": 120, "whale_movements": 120}
+BREAKER_FAILURES = 3  # consecutive failures before an endpoint's breaker opens
+BREAKER_RESET = 60  # seconds an open breaker fails fast before a half-open probe
+circuit_breakers = {}  # endpoint -> {"failures", "opened_at", "probing"}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+async def call_with_breaker(endpoint, fetch, *args, **kwargs):
+    """Call an upstream endpoint through its circuit breaker
+
+    After BREAKER_FAILURES consecutive failures (including UPSTREAM_TIMEOUTS) the breaker opens and
+    calls fail immediately. Once BREAKER_RESET seconds have passed a single
+    half-open probe is let through; success closes the breaker again.
+    """
+    breaker = circuit_breakers.setdefault(endpoint, {"failures": 0, "opened_at": None, "probing": False})
+    if breaker["opened_at"] is not None:
+        retry_in = BREAKER_RESET - (time.time() - breaker["opened_at"])
+        if breaker["probing"] or retry_in > 0:
+            raise CircuitOpenError(f"{endpoint} is unavailable, retrying in {max(retry_in, 0):.0f}s")
+        breaker["probing"] = True
+
+    try:
+        result = await asyncio.wait_for(fetch(*args, **kwargs), timeout=UPSTREAM_TIMEOUTS.get(endpoint))
+    except asyncio.CancelledError:
+        # A cancelled call says nothing about the endpoint; allow another probe
+        breaker["probing"] = False
+        raise
+    except Exception:
+        breaker["failures"] += 1
+        if breaker["probing"] or breaker["failures"] >= BREAKER_FAILURES:
+            breaker["opened_at"] = time.time()
+        breaker["probing"] = False
+        raise
+
+    breaker.update(failures=0, opened_at=None, probing=False)
+    return result
+
+# Shared market data snapshot
+MARKET_DATA_TTL = 120  # seconds a snapshot is served as fresh
+MARKET_DATA_MAX_STALE = 900  # seconds after which served snapshots carry a staleness notice
+MARKET_DATA_WAIT = 20  # seconds a command waits for a cold fetch when no snapshot exists
+LEADERBOARD_SIZE = 10  # coins kept per precomputed leaderboard
+market_snapshot = {
+    "data": None,
+    "fetched_at": 0.0,
+    "version": 0,
+    "coin_versions": {},  # symbol -> snapshot version in which its data last changed
+    "leaderboards": {},
+    "refresh": None,
+}
+
+def diff_snapshots(previous, current):
+    """Return the symbols whose data changed and the symbols removed between two snapshots"""
+    previous = previous or {}
+    changed = {symbol for symbol, data in current.items() if previous.get(symbol) != data}
+    return changed, previous.keys() - current.keys()
+
+def _percent_change(field):
+    """Sort key reading a percent change field from a (symbol, data) item"""
+    def key(item):
+        return item[1].get(field) or 0
+    return key
+
+def build_leaderboards(market_data):
+    """Precompute top gainers and losers for every percent_change_<timeframe> field"""
+    timeframe_keys = {
+        key for data in market_data.values() for key in data
+        if key.startswith("percent_change_")
+    }
+    leaderboards = {}
+    for field in timeframe_keys:
+        leaderboards[field[len("percent_change_"):]] = {
+            "gainers": heapq.nlargest(LEADERBOARD_SIZE, market_data.items(), key=_percent_change(field)),
+            "losers": heapq.nsmallest(LEADERBOARD_SIZE, market_data.items(), key=_percent_change(field)),
+        }
+    return leaderboards
+
+async def _fetch_market_data():
+    """Fetch market data, treating an empty response as a failure"""
+    market_data = await get_comprehensive_market_data()
+    if not market_data:
+        raise ValueError("provider returned no market data")
+    return market_data
+
+async def _refresh_market_snapshot():
+    """Fetch a new market snapshot and store it in the shared cache"""
+    try:
+        market_data = await call_with_breaker("market_data", _fetch_market_data)
+        changed, removed = diff_snapshots(market_snapshot["data"], market_data)
+        version = market_snapshot["version"] + 1
+        for symbol in changed:
+            market_snapshot["coin_versions"][symbol] = version
+        for symbol in removed:
+            market_snapshot["coin_versions"].pop(symbol, None)
+
+        market_snapshot["leaderboards"] = build_leaderboards(market_data)
+        market_snapshot["data"] = market_data
+        market_snapshot["fetched_at"] = time.time()
+        market_snapshot["version"] = version
+        return market_data
+    except Exception as e:
+        print(f"Error refreshing market data: {e}")
+        return None
+    finally:
+        market_snapshot["refresh"] = None
+
+async def get_market_snapshot(fresh=False):
+    """Return market data from the shared snapshot, fetching only when needed
+
+    Fresh snapshots are returned directly. Otherwise a refresh is started (shared
+    by concurrent callers) and the last good snapshot is returned at once,
+    however old it is; check stale_data_notice() to report its staleness. With
+    fresh=True the caller waits for the refresh instead. Without any snapshot
+    the caller waits at most MARKET_DATA_WAIT seconds unless fresh=True, and
+    gets None if the fetch has not finished by then.
+    """
+    age = time.time() - market_snapshot["fetched_at"]
+    if market_snapshot["data"] and age < MARKET_DATA_TTL:
+        return market_snapshot["data"]
+
+    refresh = market_snapshot["refresh"]
+    if refresh is None:
+        refresh = asyncio.create_task(_refresh_market_snapshot())
+        market_snapshot["refresh"] = refresh
+
+    if fresh:
+        market_data = await asyncio.shield(refresh)
+    elif market_snapshot["data"]:
+        return market_snapshot["data"]
+    else:
+        try:
+            market_data = await asyncio.wait_for(asyncio.shield(refresh), timeout=MARKET_DATA_WAIT)
+        except asyncio.TimeoutError:
+            market_data = None
+    return market_data or market_snapshot["data"]
+
+def market_snapshot_age():
+    """Seconds since the current market snapshot was fetched"""
+    return time.time() - market_snapshot["fetched_at"]
+
+def stale_data_notice():
+    """Warning text for snapshots older than MARKET_DATA_MAX_STALE, or None"""
+    age = market_snapshot_age()
+    if market_snapshot["data"] and age >= MARKET_DATA_MAX_STALE:
+        return f"⚠️ Market data is {age/60:.0f} minutes old - upstream provider unavailable"
+    return None
+
+# Deep coin analysis cache
+COIN_ANALYSIS_CACHE_SIZE = 256  # most recent (coin, coin version) analyses kept
+coin_analysis_cache = OrderedDict()  # (coin, coin version) -> analysis task
+coin_analysis_stats = {"hits": 0, "misses": 0}
+
+async def get_coin_analysis(coin, coin_data, coin_version):
+    """Return deep_coin_analysis for a coin, recomputed only when its data changes
+
+    coin_version must be the version of the snapshot coin_data was read from;
+    None bypasses the cache.
+    """
+    from src.brain.pattern_analyzer import deep_coin_analysis
+
+    if coin_version is None:
+        coin_analysis_stats["misses"] += 1
+        return await deep_coin_analysis(coin, coin_data)
+
+    key = (coin, coin_version)
+    analysis = coin_analysis_cache.get(key)
+    if analysis is None or (analysis.done() and (analysis.cancelled() or analysis.exception())):
+        coin_analysis_stats["misses"] += 1
+        analysis = asyncio.ensure_future(deep_coin_analysis(coin, coin_data))
+        coin_analysis_cache[key] = analysis
+        while len(coin_analysis_cache) > COIN_ANALYSIS_CACHE_SIZE:
+            coin_analysis_cache.popitem(last=False)
+    else:
+        coin_analysis_stats["hits"] += 1
+    coin_analysis_cache.move_to_end(key)
+
+    return await asyncio.shield(analysis)
+
+# Warm-start state
+WARM_START_FILE = "warm_start.pickle"  # None disables warm-start persistence
+
+def _pickle_coin_analyses():
+    """Pickle completed coin analyses one by one, skipping any that cannot be pickled"""
+    pickled = {}
+    for key, analysis in coin_analysis_cache.items():
+        if not analysis.done() or analysis.cancelled() or analysis.exception():
+            continue
+        try:
+            pickled[key] = pickle.dumps(analysis.result(), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Skipping warm-start entry {key}: {e}")
+    return pickled
+
+def save_warm_start():
+    """Write the market snapshot and analysis cache to WARM_START_FILE"""
+    if not WARM_START_FILE or not market_snapshot["data"]:
+        return
+    try:
+        state = {
+            "market_data": market_snapshot["data"],
+            "fetched_at": market_snapshot["fetched_at"],
+            "version": market_snapshot["version"],
+            "coin_versions": market_snapshot["coin_versions"],
+            "coin_analysis": _pickle_coin_analyses(),
+        }
+        with open(WARM_START_FILE + ".tmp", "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(WARM_START_FILE + ".tmp", WARM_START_FILE)
+    except Exception as e:
+        print(f"Error saving warm-start state: {e}")
+
+def load_warm_start():
+    """Restore the market snapshot and analysis cache saved by save_warm_start"""
+    if not WARM_START_FILE or market_snapshot["data"] or not os.path.exists(WARM_START_FILE):
+        return
+    try:
+        with open(WARM_START_FILE, "rb") as f:
+            state = pickle.load(f)
+    except Exception as e:
+        print(f"Error loading warm-start state: {e}")
+        return
+
+    market_snapshot["leaderboards"] = build_leaderboards(state["market_data"])
+    market_snapshot["data"] = state["market_data"]
+    market_snapshot["fetched_at"] = state["fetched_at"]
+    market_snapshot["version"] = state["version"]
+    market_snapshot["coin_versions"] = state.get("coin_versions", {})
+
+    loop = asyncio.get_running_loop()
+    for key, pickled in state["coin_analysis"].items():
+        try:
+            result = pickle.loads(pickled)
+        except Exception as e:
+            print(f"Skipping warm-start entry {key}: {e}")
+            continue
+        analysis = loop.create_future()
+        analysis.set_result(result)
+        coin_analysis_cache[key] = analysis
+
+    age = time.time() - state["fetched_at"]
+    print(f"♻️ Restored market snapshot from {age/60:.1f} minutes ago")
+
+# AI model pipeline
+MODEL_TIMEOUT = 300  # seconds each model may run before its results are dropped
+# Worker processes per model for CPU-bound analysis. The default, 0, runs the models
+# on the event loop, where long scoring runs still block the gateway heartbeat.
+# Each shard runs the model in its own event loop, so only enable this for models
+# that do not fetch data themselves.
+ANALYSIS_WORKERS = 0
+# Coins per shard sent to a worker process; 0 sends the whole market as one shard.
+# A sharded model only sees the coins in its shard, so any cross-coin logic
+# (market-wide stats, scoring relative to BTC) gives different results. Keep 0
+# unless the models score each coin independently.
+ANALYSIS_SHARD_SIZE = 0
+AI_MODELS = {"John": john_analysis, "Alpha": alpha_analysis}
+analysis_pools = {}  # model name -> ProcessPoolExecutor
+
+def _analyse_shard(name, shard, kwargs):
+    """Run one model over a shard of coins inside a worker process"""
+    return asyncio.run(AI_MODELS[name](shard, **kwargs))
+
+def _analysis_pool(name):
+    """Return the model's process pool, creating it on first use"""
+    pool = analysis_pools.get(name)
+    if pool is None:
+        # Spawned workers start clean instead of inheriting the gateway connection
+        pool = analysis_pools[name] = ProcessPoolExecutor(
+            max_workers=ANALYSIS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return pool
+
+def _reset_analysis_pool(name):
+    """Drop a broken process pool so the next run starts a fresh one"""
+    pool = analysis_pools.pop(name, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_analysis_pools():
+    """Stop all analysis worker processes"""
+    for name in list(analysis_pools):
+        _reset_analysis_pool(name)
+
+async def _run_sharded(name, market_data, **kwargs):
+    """Split market data into per-coin shards and analyse them on the model's process pool
+
+    Failed shards are skipped so the rest of the results are still returned. A
+    broken pool (a worker died) is replaced before the next run.
+    """
+    symbols = list(market_data)
+    shard_size = ANALYSIS_SHARD_SIZE or len(symbols) or 1
+    shards = [
+        {symbol: market_data[symbol] for symbol in symbols[i:i + shard_size]}
+        for i in range(0, len(symbols), shard_size)
+    ]
+    pool = _analysis_pool(name)
+    loop = asyncio.get_running_loop()
+    shard_results = await asyncio.gather(*(
+        loop.run_in_executor(pool, _analyse_shard, name, shard, kwargs)
+        for shard in shards
+    ), return_exceptions=True)
+
+    results, errors = {}, []
+    for shard_result in shard_results:
+        if isinstance(shard_result, BaseException):
+            errors.append(shard_result)
+        else:
+            results.update(shard_result or {})
+
+    if any(isinstance(e, BrokenProcessPool) for e in errors):
+        print(f"{name} analysis pool broke, restarting it")
+        _reset_analysis_pool(name)
+    if errors:
+        print(f"{name} analysis failed for {len(errors)} of {len(shards)} shards: {errors[0]}")
+        if len(errors) == len(shards):
+            raise errors[0]
+    return results
+
+async def _run_model(name, market_data, **kwargs):
+    """Run one analysis model, returning None on timeout or failure"""
+    if ANALYSIS_WORKERS > 0:
+        analysis = _run_sharded(name, market_data, **kwargs)
+    else:
+        analysis = AI_MODELS[name](market_data, **kwargs)
+
+    try:
+        return await asyncio.wait_for(analysis, timeout=MODEL_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"{name} analysis timed out after {MODEL_TIMEOUT}s")
+    except Exception as e:
+        print(f"Error in {name} analysis: {e}")
+    return None
+
+async def run_ai_models(market_data, **kwargs):
+    """Run John and Alpha analysis concurrently and return both result sets
+
+    A model that fails contributes empty results; if every model fails a
+    RuntimeError is raised so callers report an analysis error.
+    """
+    results = await asyncio.gather(*(
+        _run_model(name, market_data, **kwargs) for name in AI_MODELS
+    ))
+    if all(result is None for result in results):
+        raise RuntimeError("All AI models failed")
+    return [result or {} for result in results]
+
+# Outbound message dispatcher
+SEND_RATE = 5  # messages allowed per channel in each SEND_PERIOD (Discord's per-channel limit)
+SEND_PERIOD = 5.0  # seconds
+SEND_RETRIES = 3  # attempts per message when rate limited
+PRIORITY_ALERT = 0  # volume and whale alerts
+PRIORITY_REPLY = 1  # command responses
+PRIORITY_REPORT = 2  # scheduled analysis reports
+send_queues = {}  # channel id -> PriorityQueue of pending messages
+send_workers = {}  # channel id -> task delivering that channel's queue
+send_buckets = {}  # channel id -> (tokens, last refill time)
+send_sequence = count()
+
+def _refill_send_bucket(channel_id):
+    """Refill the channel's token bucket and return the tokens available"""
+    tokens, updated = send_buckets.get(channel_id, (SEND_RATE, time.monotonic()))
+    now = time.monotonic()
+    tokens = min(SEND_RATE, tokens + (now - updated) * SEND_RATE / SEND_PERIOD)
+    send_buckets[channel_id] = (tokens, now)
+    return tokens
+
+async def _wait_for_send_token(channel_id):
+    """Wait until the channel's token bucket allows another message"""
+    while True:
+        tokens = _refill_send_bucket(channel_id)
+        if tokens >= 1:
+            return
+        await asyncio.sleep((1 - tokens) * SEND_PERIOD / SEND_RATE)
+
+async def _send_loop(channel_id, queue):
+    """Deliver one channel's queued messages in priority order"""
+    while True:
+        item = await queue.get()
+        await _wait_for_send_token(channel_id)
+        # Pick the most urgent message now that a token is free, in case an
+        # alert was queued while waiting
+        queue.put_nowait(item)
+        priority, sequence, destination, kwargs, future, attempt = queue.get_nowait()
+        if future.cancelled():
+            continue
+
+        tokens, updated = send_buckets[channel_id]
+        send_buckets[channel_id] = (tokens - 1, updated)
+        try:
+            message = await destination.send(**kwargs)
+        except discord.HTTPException as e:
+            if e.status == 429 and attempt + 1 < SEND_RETRIES:
+                retry_after = getattr(e, 'retry_after', None) or 2 ** attempt
+                print(f"Rate limited on channel {channel_id}, retrying in {retry_after}s")
+                # Drain the bucket for retry_after seconds and requeue the message
+                send_buckets[channel_id] = (1 - retry_after * SEND_RATE / SEND_PERIOD, time.monotonic())
+                queue.put_nowait((priority, sequence, destination, kwargs, future, attempt + 1))
+            elif not future.done():
+                future.set_exception(e)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(message)
+
+async def send_message(destination, content=None, *, priority=PRIORITY_REPLY, **kwargs):
+    """Queue a message for a channel or context and wait until it is sent"""
+    channel_id = getattr(getattr(destination, 'channel', destination), 'id', None)
+    queue = send_queues.get(channel_id)
+    if queue is None:
+        queue = send_queues[channel_id] = asyncio.PriorityQueue()
+    worker = send_workers.get(channel_id)
+    if worker is None or worker.done():
+        send_workers[channel_id] = asyncio.create_task(_send_loop(channel_id, queue))
+
+    if content is not None:
+        kwargs['content'] = content
+    future = asyncio.get_running_loop().create_future()
+    queue.put_nowait((priority, next(send_sequence), destination, kwargs, future, 0))
+    return await future
+
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord limits
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+async def send_embeds(destination, embeds, *, priority=PRIORITY_REPLY):
+    """Send embeds packed into as few messages as Discord's limits allow"""
+    batch, batch_chars = [], 0
+    for embed in embeds:
+        embed_chars = len(embed)
+        if batch and (len(batch) == MAX_EMBEDS_PER_MESSAGE
+                      or batch_chars + embed_chars > MAX_EMBED_CHARS_PER_MESSAGE):
+            await send_message(destination, embeds=batch, priority=priority)
+            batch, batch_chars = [], 0
+        batch.append(embed)
+        batch_chars += embed_chars
+    if batch:
+        await send_message(destination, embeds=batch, priority=priority)
+
+# Alert cooldown index
+ALERT_COOLDOWN = 3600  # seconds before the same alert may be repeated
+ALERT_ESCALATION = 0.5  # repeat early if the alert magnitude grew by this fraction
+ALERT_INDEX_SIZE = 5000  # most recent alerts remembered
+ALERT_INDEX_FILE = None  # optional JSON file to keep the index across restarts
+alert_index = OrderedDict()  # (alert type, symbol, bucket) -> (sent_at, magnitude)
+WHALE_TRANSFER_FIELDS = ("amount", "from", "to", "from_address", "to_address")  # identify a transfer
+
+def _alert_key(alert_type, alert):
+    """Cooldown key for an alert
+
+    Whale movements are one-off transfers, so each gets its own bucket: the
+    transaction hash, or else a fingerprint of the fields that identify the
+    transfer (never timestamps or refreshed USD values). Whale alerts without
+    either, and all volume spikes, share one bucket per symbol.
+    """
+    bucket = None
+    if alert_type == "whale":
+        transfer = {field: alert[field] for field in WHALE_TRANSFER_FIELDS if field in alert}
+        bucket = alert.get('tx_hash')
+        if not bucket and transfer:
+            bucket = hashlib.sha1(json.dumps(transfer, sort_keys=True, default=str).encode()).hexdigest()
+    return (alert_type, alert.get('symbol'), bucket)
+
+def should_send_alert(alert_type, alert, magnitude=None):
+    """Check whether an alert is outside its cooldown or has escalated"""
+    entry = alert_index.get(_alert_key(alert_type, alert))
+    if not entry:
+        return True
+    sent_at, last_magnitude = entry
+    escalated = magnitude is not None and last_magnitude and magnitude >= last_magnitude * (1 + ALERT_ESCALATION)
+    return time.time() - sent_at >= ALERT_COOLDOWN or escalated
+
+def record_alert(alert_type, alert, magnitude=None):
+    """Record a sent alert in the cooldown index"""
+    key = _alert_key(alert_type, alert)
+    alert_index[key] = (time.time(), magnitude)
+    alert_index.move_to_end(key)
+    while len(alert_index) > ALERT_INDEX_SIZE:
+        alert_index.popitem(last=False)
+
+def load_alert_index():
+    """Restore the alert cooldown index from ALERT_INDEX_FILE"""
+    if not ALERT_INDEX_FILE or not os.path.exists(ALERT_INDEX_FILE):
+        return
+    try:
+        with open(ALERT_INDEX_FILE) as f:
+            for *key, sent_at, magnitude in json.load(f):
+                if time.time() - sent_at < ALERT_COOLDOWN:
+                    alert_index[tuple(key)] = (sent_at, magnitude)
+    except Exception as e:
+        print(f"Error loading alert index: {e}")
+
+def save_alert_index():
+    """Persist the alert cooldown index to ALERT_INDEX_FILE"""
+    if not ALERT_INDEX_FILE:
+        return
+    try:
+        with open(ALERT_INDEX_FILE, "w") as f:
+            json.dump([[*key, *entry] for key, entry in alert_index.items()], f)
+    except Exception as e:
+        print(f"Error saving alert index: {e}")
+
+def top_opportunities(ranked_opportunities, k, exclude=()):
+    """Take the first k ranked opportunities, skipping excluded symbols"""
+    return list(islice(
+        (o for o in ranked_opportunities if o.get('symbol') not in exclude), k
+    ))
+
+# Job schedules, aligned to UTC wall-clock boundaries. tasks.loop never overlaps
+# runs of the same job, and jobs that fire together (hourly and 4H at the top of
+# every 4th hour) share one market snapshot fetch through get_market_snapshot().
+# The volume monitor is offset from the hour so it does not add to that spike.
+HOURLY_SCHEDULE = [datetime.time(hour=h) for h in range(24)]
+FOUR_HOUR_SCHEDULE = [datetime.time(hour=h) for h in range(0, 24, 4)]
+VOLUME_MONITOR_SCHEDULE = [datetime.time(hour=h, minute=m) for h in range(24) for m in range(2, 60, 5)]
+
+@tasks.loop(time=HOURLY_SCHEDULE)
 async def hourly_analysis():
     """Comprehensive hourly analysis for all tracked cryptocurrencies"""
     try:
@@ -31,16 +561,19 @@ async def hourly_analysis():
         print(f"🔄 Starting hourly analysis at {datetime.datetime.now()}")
         
         # Get comprehensive market data
-        market_data = await get_comprehensive_market_data()
+        market_data = await get_market_snapshot(fresh=True)
         if not market_data:
-            await channel.send("⚠️ **Market Data Unavailable** - Unable to fetch market data for analysis")
+            await send_message(channel, "⚠️ **Market Data Unavailable** - Unable to fetch market data for analysis", priority=PRIORITY_REPORT)
             return
+        if stale_data_notice():
+            await send_message(channel, stale_data_notice(), priority=PRIORITY_REPORT)
 
         # Perform AI analysis
-        john_results = await john_analysis(market_data, timeframe="1H")
-        alpha_results = await alpha_analysis(market_data, timeframe="1H")
+        john_results, alpha_results = await run_ai_models(market_data, timeframe="1H")
         
-        # Send Bitcoin analysis first (dedicated hourly Bitcoin report)
+        report_embeds = []
+
+        # Bitcoin analysis first (dedicated hourly Bitcoin report)
         if 'BTC' in market_data:
             btc_john = john_results.get('BTC', {})
             btc_alpha = alpha_results.get('BTC', {})
@@ -52,33 +585,27 @@ async def hourly_analysis():
                     "1H Bitcoin Report", 
                     specific_coin='BTC'
                 )
-                await channel.send(embed=btc_embed)
-                await asyncio.sleep(2)
+                report_embeds.append(btc_embed)
         
         # Rank and filter high-potential altcoin opportunities
         ranked_opportunities = rank_opportunities(john_results, alpha_results, min_score=75)
         
-        # Send high-potential altcoin alerts (excluding Bitcoin since reported separately)
-        altcoin_count = 0
-        for opportunity in ranked_opportunities:
-            if opportunity.get('symbol') != 'BTC' and altcoin_count < 5:
-                embed = create_alert_embed(opportunity, "🚀 HIGH POTENTIAL")
-                await channel.send(embed=embed)
-                await asyncio.sleep(2)
-                altcoin_count += 1
+        # High-potential altcoin alerts (excluding Bitcoin since reported separately)
+        for opportunity in top_opportunities(ranked_opportunities, 5, exclude={'BTC'}):
+            report_embeds.append(create_alert_embed(opportunity, "🚀 HIGH POTENTIAL"))
         
-        # Send general market analysis summary
-        summary_embed = create_analysis_embed(market_data, john_results, alpha_results, "1H Market Overview")
-        await channel.send(embed=summary_embed)
+        # General market analysis summary
+        report_embeds.append(create_analysis_embed(market_data, john_results, alpha_results, "1H Market Overview"))
+        await send_embeds(channel, report_embeds, priority=PRIORITY_REPORT)
         
         last_analysis_time["hourly"] = datetime.datetime.now()
         
     except Exception as e:
         print(f"Error in hourly analysis: {e}")
         if channel:
-            await channel.send(f"❌ **Analysis Error** - {str(e)}")
+            await send_message(channel, f"❌ **Analysis Error** - {str(e)}", priority=PRIORITY_REPORT)
 
-@tasks.loop(hours=4)
+@tasks.loop(time=FOUR_HOUR_SCHEDULE)
 async def four_hour_analysis():
     """Deep 4-hour analysis with macro trend analysis"""
     try:
@@ -88,29 +615,41 @@ async def four_hour_analysis():
 
         print(f"🔍 Starting 4-hour deep analysis at {datetime.datetime.now()}")
         
-        market_data = await get_comprehensive_market_data()
+        market_data = await get_market_snapshot(fresh=True)
         if not market_data:
             return
+        if stale_data_notice():
+            # Premium signals are never issued from an outdated snapshot
+            print(f"Skipping 4-hour analysis: {stale_data_notice()}")
+            return
 
         # Deep analysis with macro trends
-        john_results = await john_analysis(market_data, timeframe="4H", deep_analysis=True)
-        alpha_results = await alpha_analysis(market_data, timeframe="4H", deep_analysis=True)
+        john_results, alpha_results = await run_ai_models(market_data, timeframe="4H", deep_analysis=True)
         
         # Filter for very high confidence predictions
         ranked_opportunities = rank_opportunities(john_results, alpha_results, min_score=85)
         
         # Send premium alerts for top opportunities
-        for opportunity in ranked_opportunities[:3]:
-            embed = create_alert_embed(opportunity, "⚡ PREMIUM SIGNAL")
-            await channel.send(embed=embed)
-            await asyncio.sleep(3)
+        await send_embeds(
+            channel,
+            [create_alert_embed(o, "⚡ PREMIUM SIGNAL") for o in top_opportunities(ranked_opportunities, 3)],
+            priority=PRIORITY_REPORT
+        )
         
         last_analysis_time["four_hour"] = datetime.datetime.now()
         
     except Exception as e:
         print(f"Error in 4-hour analysis: {e}")
 
-@tasks.loop(minutes=5)
+async def _detector_alerts(endpoint, detector):
+    """Run an alert detector through its circuit breaker, returning no alerts on failure"""
+    try:
+        return await call_with_breaker(endpoint, detector) or []
+    except Exception as e:
+        print(f"Error in {endpoint} detector: {e}")
+        return []
+
+@tasks.loop(time=VOLUME_MONITOR_SCHEDULE)
 async def volume_spike_monitor():
     """Real-time monitoring for volume spikes and whale movements"""
     try:
@@ -122,81 +661,118 @@ async def volume_spike_monitor():
         from src.data.whale_detector import detect_whale_movements
         
         # Check for volume spikes
-        volume_alerts = await detect_volume_spikes()
+        alert_embeds, sent_alerts, queued_keys = [], [], set()
+        volume_alerts = await _detector_alerts("volume_spikes", detect_volume_spikes)
         for alert in volume_alerts:
-            if alert['volume_increase'] >= 300:  # 300%+ volume spike
-                embed = create_alert_embed(alert, "📊 VOLUME SPIKE")
-                await channel.send(embed=embed)
+            key = _alert_key("volume", alert)
+            if alert['volume_increase'] >= 300 and key not in queued_keys and should_send_alert("volume", alert, alert['volume_increase']):  # 300%+ volume spike
+                alert_embeds.append(create_alert_embed(alert, "📊 VOLUME SPIKE"))
+                sent_alerts.append(("volume", alert, alert['volume_increase']))
+                queued_keys.add(key)
         
         # Check for whale movements
-        whale_alerts = await detect_whale_movements()
+        whale_alerts = await _detector_alerts("whale_movements", detect_whale_movements)
         for alert in whale_alerts:
-            embed = create_alert_embed(alert, "🐋 WHALE MOVEMENT")
-            await channel.send(embed=embed)
+            key = _alert_key("whale", alert)
+            if key not in queued_keys and should_send_alert("whale", alert):
+                alert_embeds.append(create_alert_embed(alert, "🐋 WHALE MOVEMENT"))
+                sent_alerts.append(("whale", alert, None))
+                queued_keys.add(key)
+        
+        if alert_embeds:
+            await send_embeds(channel, alert_embeds, priority=PRIORITY_ALERT)
+            # Only start cooldowns once the alerts were actually delivered
+            for alert_type, alert, magnitude in sent_alerts:
+                record_alert(alert_type, alert, magnitude)
+            save_alert_index()
             
     except Exception as e:
         print(f"Error in volume spike monitor: {e}")
 
+@tasks.loop(minutes=10)
+async def warm_start_saver():
+    """Periodically persist warm-start state"""
+    save_warm_start()
+
 @bot.command(name="analisis")
 async def manual_analysis(ctx, coin: str = None):
     """Manual analysis command for specific coin or general market"""
     try:
-        await ctx.send("🔄 **Analyzing market data...** Please wait...")
+        if coin:
+            coin = coin.upper()
+            # Unknown symbols are rejected from the cached snapshot without a fetch
+            if market_snapshot["data"] and coin not in market_snapshot["data"]:
+                await send_message(ctx, f"❌ **Coin not found** - {coin} is not in our tracking list")
+                return
+
+        if not coin or not market_snapshot["data"]:
+            await send_message(ctx, "🔄 **Analyzing market data...** Please wait...")
         
-        market_data = await get_comprehensive_market_data()
+        market_data = await get_market_snapshot()
         if not market_data:
-            await ctx.send("❌ **Error** - Unable to fetch market data")
+            await send_message(ctx, "❌ **Error** - Unable to fetch market data")
             return
+        # Capture the coin's version before any await lets the snapshot change
+        coin_version = None
+        if coin and market_snapshot["data"] is market_data:
+            coin_version = market_snapshot["coin_versions"].get(coin)
+        if stale_data_notice():
+            await send_message(ctx, stale_data_notice())
 
         if coin:
             # Specific coin analysis
-            coin = coin.upper()
             if coin in market_data:
-                from src.brain.pattern_analyzer import deep_coin_analysis
-                analysis = await deep_coin_analysis(coin, market_data[coin])
+                analysis = await get_coin_analysis(coin, market_data[coin], coin_version)
                 embed = create_analysis_embed({coin: market_data[coin]}, analysis, {}, "Manual", specific_coin=coin)
-                await ctx.send(embed=embed)
+                await send_message(ctx, embed=embed)
             else:
-                await ctx.send(f"❌ **Coin not found** - {coin} is not in our tracking list")
+                await send_message(ctx, f"❌ **Coin not found** - {coin} is not in our tracking list")
         else:
             # General market analysis
-            john_results = await john_analysis(market_data, timeframe="Manual")
-            alpha_results = await alpha_analysis(market_data, timeframe="Manual")
+            john_results, alpha_results = await run_ai_models(market_data, timeframe="Manual")
             
             ranked_opportunities = rank_opportunities(john_results, alpha_results, min_score=70)
             
             # Send top opportunities
-            for i, opportunity in enumerate(ranked_opportunities[:3], 1):
-                embed = create_alert_embed(opportunity, f"🎯 OPPORTUNITY #{i}")
-                await ctx.send(embed=embed)
-                if i < 3:
-                    await asyncio.sleep(2)
+            await send_embeds(ctx, [
+                create_alert_embed(opportunity, f"🎯 OPPORTUNITY #{i}")
+                for i, opportunity in enumerate(top_opportunities(ranked_opportunities, 3), 1)
+            ])
             
     except Exception as e:
-        await ctx.send(f"❌ **Analysis failed** - {str(e)}")
+        await send_message(ctx, f"❌ **Analysis failed** - {str(e)}")
 
 @bot.command(name="top")
-async def top_gainers(ctx, timeframe: str = "24h"):
-    """Show top gaining cryptocurrencies by timeframe"""
+async def top_gainers(ctx, timeframe: str = "24h", board: str = "gainers"):
+    """Show top gaining (or losing) cryptocurrencies by timeframe"""
     try:
-        await ctx.send(f"📈 **Fetching top gainers for {timeframe}...**")
+        board = board.lower()
+        if board not in ("gainers", "losers"):
+            await send_message(ctx, "❌ **Invalid leaderboard** - Use: gainers, losers")
+            return
+
+        if not market_snapshot["data"]:
+            await send_message(ctx, f"📈 **Fetching top {board} for {timeframe}...**")
         
-        market_data = await get_comprehensive_market_data()
+        market_data = await get_market_snapshot()
         if not market_data:
-            await ctx.send("❌ **Error** - Unable to fetch market data")
+            await send_message(ctx, "❌ **Error** - Unable to fetch market data")
             return
         
-        # Sort by price change
+        # Read the precomputed leaderboard for this snapshot
+        leaderboards = market_snapshot["leaderboards"]
+        if not leaderboards:
+            await send_message(ctx, "❌ **Error** - Market data has no price change fields to rank")
+            return
+        if timeframe not in leaderboards:
+            await send_message(ctx, f"❌ **Invalid timeframe** - Use: {', '.join(sorted(leaderboards))}")
+            return
         timeframe_key = f"percent_change_{timeframe}"
-        sorted_coins = sorted(
-            market_data.items(),
-            key=lambda x: x[1].get(timeframe_key, 0),
-            reverse=True
-        )[:10]
+        sorted_coins = leaderboards[timeframe][board]
         
         embed = discord.Embed(
-            title=f"🏆 Top Gainers ({timeframe})",
-            color=0x00ff00,
+            title=f"🏆 Top {board.capitalize()} ({timeframe})",
+            color=0x00ff00 if board == "gainers" else 0xff0000,
             timestamp=datetime.datetime.now()
         )
         
@@ -211,21 +787,23 @@ async def top_gainers(ctx, timeframe: str = "24h"):
                 inline=True
             )
         
-        await ctx.send(embed=embed)
+        if stale_data_notice():
+            embed.set_footer(text=stale_data_notice())
+        await send_message(ctx, embed=embed)
         
     except Exception as e:
-        await ctx.send(f"❌ **Error** - {str(e)}")
+        await send_message(ctx, f"❌ **Error** - {str(e)}")
 
 @bot.command(name="alerts")
 async def toggle_alerts(ctx, alert_type: str = "all"):
     """Toggle different types of alerts"""
     valid_types = ["volume", "whale", "technical", "all"]
     if alert_type not in valid_types:
-        await ctx.send(f"❌ **Invalid alert type** - Use: {', '.join(valid_types)}")
+        await send_message(ctx, f"❌ **Invalid alert type** - Use: {', '.join(valid_types)}")
         return
     
     # Implementation for alert toggling would go here
-    await ctx.send(f"✅ **Alert settings updated** - {alert_type} alerts configured")
+    await send_message(ctx, f"✅ **Alert settings updated** - {alert_type} alerts configured")
 
 @bot.command(name="status")
 async def bot_status(ctx):
@@ -255,7 +833,21 @@ async def bot_status(ctx):
     embed.add_field(name="🔍 4H Analysis", value="✅ Running" if four_hour_analysis.is_running() else "❌ Stopped", inline=True)
     embed.add_field(name="📊 Volume Monitor", value="✅ Running" if volume_spike_monitor.is_running() else "❌ Stopped", inline=True)
     
-    await ctx.send(embed=embed)
+    # Add market data freshness
+    if market_snapshot["data"]:
+        embed.add_field(name="📡 Market Data", value=f"{market_snapshot_age()/60:.1f} minutes old", inline=True)
+    open_breakers = [endpoint for endpoint, breaker in circuit_breakers.items() if breaker["opened_at"] is not None]
+    if open_breakers:
+        embed.add_field(name="🚧 Circuit Open", value=", ".join(open_breakers), inline=True)
+    
+    # Add coin analysis cache stats
+    embed.add_field(
+        name="🧠 Analysis Cache",
+        value=f"{coin_analysis_stats['hits']} hits / {coin_analysis_stats['misses']} misses",
+        inline=True
+    )
+    
+    await send_message(ctx, embed=embed)
 
 @bot.event
 async def on_ready():
@@ -265,6 +857,8 @@ async def on_ready():
     print(f"⏰ Started at: {datetime.datetime.now()}")
     
     bot.start_time = datetime.datetime.now()
+    load_warm_start()
+    load_alert_index()
     
     # Start automated tasks
     if not hourly_analysis.is_running():
@@ -279,6 +873,9 @@ async def on_ready():
         volume_spike_monitor.start()
         print("✅ Volume spike monitor started")
     
+    if WARM_START_FILE and not warm_start_saver.is_running():
+        warm_start_saver.start()
+    
     # Send startup message
     channel = bot.get_channel(CHANNEL_ID)
     if channel:
@@ -289,17 +886,17 @@ async def on_ready():
             timestamp=datetime.datetime.now()
         )
         embed.add_field(name="⚡ Features Active", value="• Hourly market analysis\n• Volume spike detection\n• Whale movement tracking\n• Technical pattern recognition\n• Sentiment analysis", inline=False)
-        await channel.send(embed=embed)
+        await send_message(channel, embed=embed, priority=PRIORITY_REPORT)
 
 @bot.event
 async def on_command_error(ctx, error):
     """Global error handler"""
     if isinstance(error, commands.CommandNotFound):
-        await ctx.send("❌ **Command not found** - Use `!help` for available commands")
+        await send_message(ctx, "❌ **Command not found** - Use `!help` for available commands")
     elif isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(f"❌ **Missing argument** - {error}")
+        await send_message(ctx, f"❌ **Missing argument** - {error}")
     else:
-        await ctx.send(f"❌ **Error** - {str(error)}")
+        await send_message(ctx, f"❌ **Error** - {str(error)}")
         print(f"Command error: {error}")
 
 if __name__ == "__main__":
@@ -311,3 +908,6 @@ if __name__ == "__main__":
         bot.run(DISCORD_TOKEN)
     except Exception as e:
         print(f"Failed to start bot: {e}")
+    finally:
+        save_warm_start()
+        shutdown_analysis_pools()
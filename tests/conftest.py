@@ -0,0 +1,156 @@
+"""Stub out discord, config and the src.* analysis packages so main.py can be imported"""
+import asyncio
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+class Intents:
+    @classmethod
+    def default(cls):
+        return cls()
+
+
+class Embed:
+    def __init__(self, title="", description="", **kwargs):
+        self.title = title
+        self.description = description
+        self.fields = []
+        self.footer = None
+
+    def add_field(self, name, value, inline=True):
+        self.fields.append((name, value))
+
+    def set_footer(self, text):
+        self.footer = text
+
+    def __len__(self):
+        return (len(self.title) + len(self.description) + len(self.footer or "")
+                + sum(len(name) + len(value) for name, value in self.fields))
+
+
+class HTTPException(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Bot:
+    def __init__(self, **kwargs):
+        pass
+
+    def command(self, name=None):
+        return lambda func: func
+
+    def event(self, func):
+        return func
+
+    def get_channel(self, channel_id):
+        return None
+
+
+class Loop:
+    def __init__(self, coro, **kwargs):
+        self.coro = coro
+        self.kwargs = kwargs
+        self.running = False
+
+    def __call__(self, *args, **kwargs):
+        return self.coro(*args, **kwargs)
+
+    def is_running(self):
+        return self.running
+
+    def start(self):
+        self.running = True
+
+
+async def _no_results(*args, **kwargs):
+    return {}
+
+
+async def _no_alerts(*args, **kwargs):
+    return []
+
+
+_module("discord", Intents=Intents, Embed=Embed, HTTPException=HTTPException)
+_module("discord.ext")
+_module(
+    "discord.ext.commands", Bot=Bot,
+    CommandNotFound=type("CommandNotFound", (Exception,), {}),
+    MissingRequiredArgument=type("MissingRequiredArgument", (Exception,), {}),
+)
+_module("discord.ext.tasks", loop=lambda **kwargs: lambda coro: Loop(coro, **kwargs))
+sys.modules["discord"].ext = sys.modules["discord.ext"]
+sys.modules["discord.ext"].commands = sys.modules["discord.ext.commands"]
+sys.modules["discord.ext"].tasks = sys.modules["discord.ext.tasks"]
+
+for package in ("src", "src.brain", "src.data", "src.analysis", "src.utils"):
+    _module(package)
+_module("src.brain.john_ai", john_analysis=_no_results)
+_module("src.brain.alpha_ai", alpha_analysis=_no_results)
+_module("src.brain.pattern_analyzer", deep_coin_analysis=_no_results)
+_module("src.data.market_data", get_comprehensive_market_data=_no_results)
+_module("src.data.whale_detector", detect_whale_movements=_no_alerts)
+_module("src.analysis.volume_analyzer", detect_volume_spikes=_no_alerts)
+_module("src.analysis.scoring_engine", rank_opportunities=lambda *args, **kwargs: [])
+_module(
+    "src.utils.formatters",
+    create_alert_embed=lambda alert, title: Embed(title=title),
+    create_analysis_embed=lambda *args, **kwargs: Embed(title="analysis"),
+)
+_module("config", CHANNEL_ID=1, DISCORD_TOKEN="", keep_alive=lambda: None)
+
+
+@pytest.fixture
+def main():
+    """A freshly imported main module, so caches and breakers start empty"""
+    import main as module
+    return importlib.reload(module)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeChannel:
+    """A channel or command context that records sends, raising queued errors first"""
+
+    def __init__(self, channel_id=1, fail=None):
+        self.id = channel_id
+        self.sent = []
+        self.fail = list(fail or [])
+
+    async def send(self, **kwargs):
+        if self.fail:
+            raise self.fail.pop(0)
+        self.sent.append(kwargs)
+        return kwargs
+
+
+def counting_fetch(results, delay=0.01):
+    """A market data fetch that returns (or raises) results in order and counts calls"""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        result = results[min(len(calls), len(results)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return fetch, calls
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from conftest import run
+
+
+def test_one_failing_model_keeps_the_other_results(main, monkeypatch):
+    async def john(market_data, **kwargs):
+        return {"BTC": {"score": 90}}
+
+    async def alpha(market_data, **kwargs):
+        raise ValueError("broken")
+
+    monkeypatch.setitem(main.AI_MODELS, "John", john)
+    monkeypatch.setitem(main.AI_MODELS, "Alpha", alpha)
+    assert run(main.run_ai_models({"BTC": {}})) == [{"BTC": {"score": 90}}, {}]
+
+
+def test_all_models_failing_raises(main, monkeypatch):
+    async def broken(market_data, **kwargs):
+        raise ValueError("broken")
+
+    monkeypatch.setitem(main.AI_MODELS, "John", broken)
+    monkeypatch.setitem(main.AI_MODELS, "Alpha", broken)
+    with pytest.raises(RuntimeError):
+        run(main.run_ai_models({"BTC": {}}))
+
+
+def test_broken_pool_is_replaced_and_other_shards_kept(main, monkeypatch):
+    def analyse_shard(name, shard, kwargs):
+        if "BAD" in shard:
+            raise BrokenProcessPool("worker died")
+        return {symbol: name for symbol in shard}
+
+    monkeypatch.setattr(main, "_analyse_shard", analyse_shard)
+    monkeypatch.setattr(main, "ANALYSIS_SHARD_SIZE", 1)
+    main.analysis_pools["John"] = ThreadPoolExecutor(max_workers=2)
+
+    results = run(main._run_sharded("John", {"BTC": {}, "BAD": {}}))
+    assert results == {"BTC": "John"}
+    assert "John" not in main.analysis_pools
+
+
+def test_unsharded_mode_gives_the_model_the_whole_market(main, monkeypatch):
+    shards = []
+
+    def analyse_shard(name, shard, kwargs):
+        shards.append(sorted(shard))
+        return {symbol: len(shard) for symbol in shard}
+
+    monkeypatch.setattr(main, "_analyse_shard", analyse_shard)
+    main.analysis_pools["John"] = ThreadPoolExecutor(max_workers=2)
+
+    results = run(main._run_sharded("John", {"BTC": {}, "ETH": {}, "SOL": {}}))
+    assert shards == [["BTC", "ETH", "SOL"]]
+    assert results == {"BTC": 3, "ETH": 3, "SOL": 3}
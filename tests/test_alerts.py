@@ -0,0 +1,83 @@
+import sys
+import time
+
+from conftest import FakeChannel, HTTPException, run
+
+
+def spikes(*alerts):
+    async def detect_volume_spikes():
+        return list(alerts)
+    return detect_volume_spikes
+
+
+def whales(*alerts):
+    async def detect_whale_movements():
+        return list(alerts)
+    return detect_whale_movements
+
+
+def test_volume_alerts_cool_down_and_escalate(main):
+    alert = {"symbol": "SOL"}
+    main.record_alert("volume", alert, 300)
+    assert not main.should_send_alert("volume", alert, 320)
+    assert main.should_send_alert("volume", alert, 450)
+
+    main.alert_index[main._alert_key("volume", alert)] = (time.time() - main.ALERT_COOLDOWN, 300)
+    assert main.should_send_alert("volume", alert, 300)
+
+
+def test_distinct_whale_transfers_are_not_deduplicated(main):
+    main.record_alert("whale", {"symbol": "BTC", "tx_hash": "a"})
+    assert not main.should_send_alert("whale", {"symbol": "BTC", "tx_hash": "a"})
+    assert main.should_send_alert("whale", {"symbol": "BTC", "tx_hash": "b"})
+
+
+def test_failed_send_does_not_start_cooldown(main, monkeypatch):
+    channel = FakeChannel(fail=[HTTPException(500)])
+    monkeypatch.setattr(main.bot, "get_channel", lambda channel_id: channel, raising=False)
+    monkeypatch.setattr(sys.modules["src.analysis.volume_analyzer"], "detect_volume_spikes",
+                        spikes({"symbol": "SOL", "volume_increase": 400}))
+
+    run(main.volume_spike_monitor())
+    assert not main.alert_index
+
+    run(main.volume_spike_monitor())
+    assert len(channel.sent) == 1
+    assert ("volume", "SOL", None) in main.alert_index
+
+
+def test_alert_index_round_trips_through_file(main, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "ALERT_INDEX_FILE", str(tmp_path / "alerts.json"))
+    main.record_alert("whale", {"symbol": "BTC", "tx_hash": "a"})
+    main.save_alert_index()
+    main.alert_index.clear()
+
+    main.load_alert_index()
+    assert ("whale", "BTC", "a") in main.alert_index
+
+
+def test_whale_fingerprint_ignores_volatile_fields(main):
+    first = {"symbol": "BTC", "amount": 500, "to": "exchange", "detected_at": 1, "amount_usd": 30_000_000}
+    main.record_alert("whale", first)
+    assert not main.should_send_alert("whale", dict(first, detected_at=2, amount_usd=31_000_000))
+    assert main.should_send_alert("whale", dict(first, amount=800))
+
+
+def test_whale_alerts_without_identity_share_the_symbol_cooldown(main):
+    main.record_alert("whale", {"symbol": "BTC", "detected_at": 1})
+    assert not main.should_send_alert("whale", {"symbol": "BTC", "detected_at": 2})
+    assert main._alert_key("whale", {"symbol": "BTC"}) == ("whale", "BTC", None)
+
+
+def test_repeated_keys_in_one_cycle_are_sent_once(main, monkeypatch):
+    channel = FakeChannel()
+    monkeypatch.setattr(main.bot, "get_channel", lambda channel_id: channel, raising=False)
+    monkeypatch.setattr(sys.modules["src.analysis.volume_analyzer"], "detect_volume_spikes", spikes(
+        {"symbol": "SOL", "volume_increase": 400}, {"symbol": "SOL", "volume_increase": 420}
+    ))
+    monkeypatch.setattr(sys.modules["src.data.whale_detector"], "detect_whale_movements", whales(
+        {"symbol": "BTC", "tx_hash": "a"}, {"symbol": "BTC", "tx_hash": "a"}, {"symbol": "BTC", "tx_hash": "b"}
+    ))
+
+    run(main.volume_spike_monitor())
+    assert [len(m["embeds"]) for m in channel.sent] == [3]
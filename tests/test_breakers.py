@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import counting_fetch, run
+
+
+def open_breaker(main, endpoint):
+    main.circuit_breakers[endpoint] = {
+        "failures": main.BREAKER_FAILURES, "opened_at": time.time() - main.BREAKER_RESET - 1, "probing": False
+    }
+
+
+def test_breaker_opens_and_fails_fast(main):
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise ValueError("down")
+
+    async def scenario():
+        for _ in range(main.BREAKER_FAILURES):
+            with pytest.raises(ValueError):
+                await main.call_with_breaker("endpoint", failing)
+        with pytest.raises(main.CircuitOpenError):
+            await main.call_with_breaker("endpoint", failing)
+
+    run(scenario())
+    assert len(calls) == main.BREAKER_FAILURES
+
+
+def test_half_open_probe_closes_breaker(main):
+    async def ok():
+        return "ok"
+
+    open_breaker(main, "endpoint")
+    assert run(main.call_with_breaker("endpoint", ok)) == "ok"
+    assert main.circuit_breakers["endpoint"]["opened_at"] is None
+
+
+def test_cancelled_probe_allows_another_probe(main):
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    open_breaker(main, "endpoint")
+
+    async def scenario():
+        probe = asyncio.create_task(main.call_with_breaker("endpoint", hang))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await main.call_with_breaker("endpoint", ok)
+
+    assert run(scenario()) == "ok"
+
+
+def test_failed_refresh_falls_back_to_last_good_snapshot(main, monkeypatch):
+    fetch, _ = counting_fetch([ValueError("down")])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+    old = time.time() - main.MARKET_DATA_MAX_STALE - 60
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=old)
+
+    assert run(main.get_market_snapshot(fresh=True)) == {"BTC": {"price": 1}}
+    assert main.stale_data_notice() is not None
+
+
+def hanging_fetch():
+    async def fetch():
+        await asyncio.sleep(30)
+    return fetch
+
+
+def test_command_gets_last_good_snapshot_while_provider_hangs(main, monkeypatch):
+    monkeypatch.setattr(main, "get_comprehensive_market_data", hanging_fetch())
+    old = time.time() - main.MARKET_DATA_MAX_STALE - 60
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=old)
+
+    async def scenario():
+        return await asyncio.wait_for(main.get_market_snapshot(), timeout=0.5)
+
+    assert run(scenario()) == {"BTC": {"price": 1}}
+    assert main.stale_data_notice() is not None
+
+
+def test_cold_command_waits_at_most_market_data_wait(main, monkeypatch):
+    monkeypatch.setattr(main, "get_comprehensive_market_data", hanging_fetch())
+    monkeypatch.setattr(main, "MARKET_DATA_WAIT", 0.05)
+
+    async def scenario():
+        return await asyncio.wait_for(main.get_market_snapshot(), timeout=0.5)
+
+    assert run(scenario()) is None
+
+
+def test_hung_fetches_open_the_breaker(main, monkeypatch):
+    monkeypatch.setattr(main, "get_comprehensive_market_data", hanging_fetch())
+    monkeypatch.setitem(main.UPSTREAM_TIMEOUTS, "market_data", 0.01)
+
+    async def scenario():
+        for _ in range(main.BREAKER_FAILURES):
+            assert await main.get_market_snapshot(fresh=True) is None
+
+    run(scenario())
+    assert main.circuit_breakers["market_data"]["opened_at"] is not None
@@ -0,0 +1,70 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from conftest import FakeChannel, counting_fetch, run
+
+
+@pytest.fixture
+def deep_calls(monkeypatch):
+    calls = []
+
+    async def deep_coin_analysis(coin, data):
+        calls.append(coin)
+        await asyncio.sleep(0.01)
+        return {coin: data}
+
+    monkeypatch.setattr(sys.modules["src.brain.pattern_analyzer"], "deep_coin_analysis", deep_coin_analysis)
+    return calls
+
+
+def test_coin_analysis_is_shared_per_version(main, deep_calls):
+    async def scenario():
+        await asyncio.gather(*(main.get_coin_analysis("SOL", {"price": 1}, 1) for _ in range(3)))
+        await main.get_coin_analysis("SOL", {"price": 2}, 2)
+
+    run(scenario())
+    assert deep_calls == ["SOL", "SOL"]
+    assert main.coin_analysis_stats == {"hits": 2, "misses": 2}
+
+
+def test_unversioned_analysis_bypasses_the_cache(main, deep_calls):
+    run(main.get_coin_analysis("SOL", {"price": 1}, None))
+    assert deep_calls == ["SOL"]
+    assert not main.coin_analysis_cache
+
+
+def test_unknown_coin_is_rejected_without_fetching(main, monkeypatch, deep_calls):
+    fetch, calls = counting_fetch([{"BTC": {"price": 1}}])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=time.time() - main.MARKET_DATA_TTL - 1)
+    ctx = FakeChannel()
+
+    run(main.manual_analysis(ctx, "doge"))
+    assert [m["content"] for m in ctx.sent] == ["❌ **Coin not found** - DOGE is not in our tracking list"]
+    assert not calls and not deep_calls
+
+
+def test_known_coin_is_answered_from_the_cached_snapshot(main, monkeypatch, deep_calls):
+    fetch, calls = counting_fetch([{"BTC": {"price": 1}}])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=time.time(), coin_versions={"BTC": 1})
+    ctx = FakeChannel()
+
+    run(main.manual_analysis(ctx, "btc"))
+    assert [list(m) for m in ctx.sent] == [["embed"]]
+    assert not calls
+    assert deep_calls == ["BTC"]
+
+
+def test_cold_start_shows_the_placeholder(main, monkeypatch, deep_calls):
+    fetch, calls = counting_fetch([{"BTC": {"price": 1}}])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+    ctx = FakeChannel()
+
+    run(main.manual_analysis(ctx, "BTC"))
+    assert ctx.sent[0]["content"].startswith("🔄")
+    assert "embed" in ctx.sent[-1]
+    assert len(calls) == 1
@@ -0,0 +1,52 @@
+import time
+
+from conftest import FakeChannel, run
+
+
+def snapshot(main, market_data):
+    main.market_snapshot.update(
+        data=market_data, fetched_at=time.time(), leaderboards=main.build_leaderboards(market_data)
+    )
+
+
+def test_leaderboards_rank_gainers_and_losers(main):
+    leaderboards = main.build_leaderboards({
+        "A": {"percent_change_24h": 5},
+        "B": {"percent_change_24h": -2},
+        "C": {"percent_change_1h": 1},
+    })
+    assert sorted(leaderboards) == ["1h", "24h"]
+    assert [symbol for symbol, _ in leaderboards["24h"]["gainers"]] == ["A", "C", "B"]
+    assert [symbol for symbol, _ in leaderboards["24h"]["losers"]] == ["B", "C", "A"]
+
+
+def test_top_reads_the_precomputed_board(main):
+    snapshot(main, {"A": {"percent_change_24h": 5}, "B": {"percent_change_24h": -2}})
+    ctx = FakeChannel()
+
+    run(main.top_gainers(ctx, "24h", "losers"))
+    embed = ctx.sent[0]["embed"]
+    assert embed.title == "🏆 Top Losers (24h)"
+    assert [name for name, _ in embed.fields] == ["1. B", "2. A"]
+
+
+def test_top_rejects_unknown_timeframes(main):
+    snapshot(main, {"A": {"percent_change_24h": 5, "percent_change_1h": 1}})
+    ctx = FakeChannel()
+
+    run(main.top_gainers(ctx, "7d"))
+    assert ctx.sent == [{"content": "❌ **Invalid timeframe** - Use: 1h, 24h"}]
+
+
+def test_top_reports_missing_price_change_fields(main):
+    snapshot(main, {"A": {"price": 1}})
+    ctx = FakeChannel()
+
+    run(main.top_gainers(ctx, "24h"))
+    assert ctx.sent == [{"content": "❌ **Error** - Market data has no price change fields to rank"}]
+
+
+def test_top_rejects_unknown_boards(main):
+    ctx = FakeChannel()
+    run(main.top_gainers(ctx, "24h", "sideways"))
+    assert ctx.sent == [{"content": "❌ **Invalid leaderboard** - Use: gainers, losers"}]
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import Embed, FakeChannel, HTTPException, run
+
+
+def test_alerts_preempt_queued_reports(main, monkeypatch):
+    monkeypatch.setattr(main, "SEND_PERIOD", 0.05)
+    channel = FakeChannel()
+    main.send_buckets[channel.id] = (0, time.monotonic())
+
+    async def scenario():
+        report = asyncio.create_task(main.send_message(channel, "report", priority=main.PRIORITY_REPORT))
+        await asyncio.sleep(0)
+        alert = asyncio.create_task(main.send_message(channel, "alert", priority=main.PRIORITY_ALERT))
+        await asyncio.gather(report, alert)
+
+    run(scenario())
+    assert [m["content"] for m in channel.sent] == ["alert", "report"]
+
+
+def test_rate_limited_channel_does_not_block_others(main):
+    slow, fast = FakeChannel(1), FakeChannel(2)
+    main.send_buckets[slow.id] = (-100, time.monotonic())
+
+    async def scenario():
+        blocked = asyncio.create_task(main.send_message(slow, "waiting"))
+        await asyncio.wait_for(main.send_message(fast, "hello"), timeout=1)
+        blocked.cancel()
+
+    run(scenario())
+    assert fast.sent == [{"content": "hello"}]
+
+
+def test_429_is_retried_after_backoff(main):
+    channel = FakeChannel(fail=[HTTPException(429, retry_after=0.01)])
+    run(main.send_message(channel, "hello"))
+    assert channel.sent == [{"content": "hello"}]
+
+
+def test_send_errors_reach_the_caller(main):
+    channel = FakeChannel(fail=[HTTPException(500)])
+    with pytest.raises(HTTPException):
+        run(main.send_message(channel, "hello"))
+
+
+def test_embeds_are_packed_within_discord_limits(main):
+    channel = FakeChannel()
+    small = [Embed(title="x") for _ in range(12)]
+    large = [Embed(title="x" * 4000) for _ in range(2)]
+    run(main.send_embeds(channel, small + large))
+    assert [len(m["embeds"]) for m in channel.sent] == [10, 3, 1]
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+from conftest import counting_fetch, run
+
+
+def test_concurrent_callers_share_one_fetch(main, monkeypatch):
+    fetch, calls = counting_fetch([{"BTC": {"price": 1}}])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+
+    async def scenario():
+        return await asyncio.gather(*(main.get_market_snapshot() for _ in range(5)))
+
+    assert run(scenario()) == [{"BTC": {"price": 1}}] * 5
+    assert len(calls) == 1
+
+
+def test_fresh_snapshot_is_served_without_fetching(main, monkeypatch):
+    fetch, calls = counting_fetch([{"BTC": {"price": 1}}])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+
+    async def scenario():
+        await main.get_market_snapshot()
+        return await main.get_market_snapshot()
+
+    assert run(scenario()) == {"BTC": {"price": 1}}
+    assert len(calls) == 1
+
+
+def test_stale_snapshot_is_served_while_refreshing(main, monkeypatch):
+    fetch, calls = counting_fetch([{"BTC": {"price": 2}}])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=time.time() - main.MARKET_DATA_TTL - 1)
+
+    async def scenario():
+        stale = await main.get_market_snapshot()
+        await main.market_snapshot["refresh"]
+        return stale, main.market_snapshot["data"]
+
+    assert run(scenario()) == ({"BTC": {"price": 1}}, {"BTC": {"price": 2}})
+    assert len(calls) == 1
+
+
+def test_fresh_request_waits_for_refresh(main, monkeypatch):
+    fetch, _ = counting_fetch([{"BTC": {"price": 2}}])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=time.time() - main.MARKET_DATA_TTL - 1)
+
+    assert run(main.get_market_snapshot(fresh=True)) == {"BTC": {"price": 2}}
+
+
+def test_coin_versions_only_change_for_changed_coins(main, monkeypatch):
+    fetch, _ = counting_fetch([
+        {"BTC": {"price": 1}, "ETH": {"price": 1}, "SOL": {"price": 1}},
+        {"BTC": {"price": 2}, "ETH": {"price": 1}},
+    ])
+    monkeypatch.setattr(main, "get_comprehensive_market_data", fetch)
+
+    async def scenario():
+        await main.get_market_snapshot()
+        main.market_snapshot["fetched_at"] = 0
+        await main.get_market_snapshot(fresh=True)
+
+    run(scenario())
+    assert main.market_snapshot["coin_versions"] == {"BTC": 2, "ETH": 1}
+
+
+def test_diff_snapshots_reports_changed_and_removed_symbols(main):
+    changed, removed = main.diff_snapshots(
+        {"BTC": {"price": 1}, "ETH": {"price": 1}, "SOL": {"price": 1}},
+        {"BTC": {"price": 2}, "ETH": {"price": 1}, "ADA": {"price": 1}},
+    )
+    assert changed == {"BTC", "ADA"}
+    assert removed == {"SOL"}
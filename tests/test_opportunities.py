@@ -0,0 +1,7 @@
+def test_top_opportunities_skips_excluded_symbols(main):
+    ranked = [{"symbol": "BTC"}, {"symbol": "ETH"}, {"symbol": "SOL"}]
+    assert main.top_opportunities(ranked, 1, exclude={"BTC"}) == [{"symbol": "ETH"}]
+
+
+def test_top_opportunities_returns_fewer_when_short(main):
+    assert main.top_opportunities([{"symbol": "BTC"}], 3, exclude={"BTC"}) == []
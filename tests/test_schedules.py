@@ -0,0 +1,21 @@
+import datetime
+
+
+def minutes(times):
+    return [t.hour * 60 + t.minute for t in times]
+
+
+def test_hourly_and_four_hour_jobs_run_on_the_hour(main):
+    assert minutes(main.hourly_analysis.kwargs["time"]) == list(range(0, 24 * 60, 60))
+    assert minutes(main.four_hour_analysis.kwargs["time"]) == list(range(0, 24 * 60, 240))
+
+
+def test_four_hour_slots_coincide_with_hourly_slots(main):
+    assert set(main.FOUR_HOUR_SCHEDULE) <= set(main.HOURLY_SCHEDULE)
+
+
+def test_volume_monitor_runs_every_five_minutes_off_the_hour(main):
+    slots = minutes(main.volume_spike_monitor.kwargs["time"])
+    assert slots == list(range(2, 24 * 60, 5))
+    assert not set(main.VOLUME_MONITOR_SCHEDULE) & set(main.HOURLY_SCHEDULE)
+    assert all(isinstance(t, datetime.time) for t in main.VOLUME_MONITOR_SCHEDULE)
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from conftest import run
+
+
+def test_warm_start_round_trip_skips_unpicklable_entries(main, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "WARM_START_FILE", str(tmp_path / "warm.pickle"))
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=time.time(), version=3, coin_versions={"BTC": 3})
+
+    async def save():
+        loop = asyncio.get_running_loop()
+        for key, result in ((("BTC", 3), {"ok": True}), (("ETH", 3), lambda: None)):
+            analysis = loop.create_future()
+            analysis.set_result(result)
+            main.coin_analysis_cache[key] = analysis
+        main.save_warm_start()
+
+    run(save())
+    main.market_snapshot.update(data=None, version=0, coin_versions={})
+    main.coin_analysis_cache.clear()
+
+    async def load():
+        main.load_warm_start()
+        return {key: analysis.result() for key, analysis in main.coin_analysis_cache.items()}
+
+    assert run(load()) == {("BTC", 3): {"ok": True}}
+    assert main.market_snapshot["data"] == {"BTC": {"price": 1}}
+    assert main.market_snapshot["version"] == 3
+    assert main.market_snapshot["coin_versions"] == {"BTC": 3}
+
+
+def test_warm_start_does_not_replace_a_live_snapshot(main, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "WARM_START_FILE", str(tmp_path / "warm.pickle"))
+    main.market_snapshot.update(data={"BTC": {"price": 1}}, fetched_at=time.time())
+    main.save_warm_start()
+    main.market_snapshot.update(data={"BTC": {"price": 2}})
+
+    main.load_warm_start()
+    assert main.market_snapshot["data"] == {"BTC": {"price": 2}}